@@ -1,9 +1,15 @@
+import array
 import itertools
-import random
 from collections import deque
 import functools
+import heapq
+import math
 import concurrent.futures
 import os
+from multiprocessing import shared_memory
+
+import numba
+import numpy as np
 
 # ============================================================
 # Aphelios Simulation Code with Optimized Runtime, Integrated Damage Calculation,
@@ -180,6 +186,37 @@ WEAPONS = {
     )
 }
 
+# Integer weapon identities in queue order, so the jitted DPS core can branch on
+# int compares instead of weapon names.
+WEAPON_ORDER = ("Calibrum", "Severum", "Gravitum", "Infernum", "Crescendum")
+CALIBRUM, SEVERUM, GRAVITUM, INFERNUM, CRESCENDUM = range(len(WEAPON_ORDER))
+WEAPON_INDEX = {name: i for i, name in enumerate(WEAPON_ORDER)}
+
+# WEAPON_SYNERGIES multipliers as a symmetric matrix indexed by [main, off]
+SYNERGY_MULT = np.ones((len(WEAPON_ORDER), len(WEAPON_ORDER)), dtype=np.float64)
+for (_first, _second), _synergy in WEAPON_SYNERGIES.items():
+    _i, _j = WEAPON_INDEX[_first], WEAPON_INDEX[_second]
+    SYNERGY_MULT[_i, _j] = SYNERGY_MULT[_j, _i] = _synergy.get("multiplier", 1.0)
+
+def _ability_multiplier(weapon):
+    effects = weapon.ability_effect
+    if weapon.name == "Calibrum":
+        return 1 + effects.get("execute", 0.0)
+    if weapon.name == "Severum":
+        return 1 + effects.get("lifesteal_boost", 0.0)
+    if weapon.name == "Infernum":
+        return (1 + effects.get("splash", 0.0)) * 1.25  # AOE bonus
+    return 1.0
+
+WEAPON_MODS = np.array([WEAPONS[w].base_damage_mod for w in WEAPON_ORDER], dtype=np.float64)
+WEAPON_MOONLIGHT = np.array([WEAPONS[w].moonlight for w in WEAPON_ORDER], dtype=np.float64)
+WEAPON_ABILITY_MULT = np.array([_ability_multiplier(WEAPONS[w]) for w in WEAPON_ORDER], dtype=np.float64)
+WEAPON_MOD0 = WEAPON_MODS[:, 0]  # auto attack damage modifier
+WEAPON_MOD1 = WEAPON_MODS[:, 1]  # ability damage modifier
+WEAPON_AD_BONUS = np.array([0.15, 0.0, 0.0, 0.75, 0.0], dtype=np.float64)  # on-attack %AD: Calibrum mark, Infernum splash
+STARTING_AMMO = np.full(len(WEAPON_ORDER), 50, dtype=np.int64)
+RNG_BUFFER_SIZE = 4096  # uniforms drawn per refill of a simulator's random buffer
+
 # ============================================================
 # Item Definitions
 # ============================================================
@@ -224,11 +261,11 @@ ITEMS = {
 
 ITEM_CONSTRAINTS = {
     "last_whisper": {
-        "items": ["Lord Dominik's Regards", "Serylda's Grudge", "Mortal Reminder","Black Cleaver"],
+        "items": frozenset(["Lord Dominik's Regards", "Serylda's Grudge", "Mortal Reminder","Black Cleaver"]),
         "max": 1
     },
     "lifeline": {
-        "items": ["Immortal Shieldbow", "Maw of Malmortius", "Sterak's Gage"],
+        "items": frozenset(["Immortal Shieldbow", "Maw of Malmortius", "Sterak's Gage"]),
         "max": 1
     }
 }
@@ -244,6 +281,174 @@ def is_valid_build(combo):
             return False
     return True
 
+def _constraint_partition():
+    """
+    Splits ITEMS into one (items, max) pair per constraint group plus the
+    unconstrained remainder. Constraint groups are disjoint.
+    """
+    groups = [
+        ([item for item in ITEMS if item in group["items"]], group["max"])
+        for group in ITEM_CONSTRAINTS.values()
+    ]
+    constrained = {item for items, _ in groups for item in items}
+    free = [item for item in ITEMS if item not in constrained]
+    return groups, free
+
+def valid_item_combinations(build_size=5):
+    """
+    Yields every build that satisfies ITEM_CONSTRAINTS, picking up to `max`
+    items from each constraint group and filling the rest from free items,
+    so invalid builds are never generated.
+    """
+    groups, free = _constraint_partition()
+    group_choices = [
+        [picked for k in range(max_count + 1) for picked in itertools.combinations(items, k)]
+        for items, max_count in groups
+    ]
+    for picks in itertools.product(*group_choices):
+        chosen = tuple(itertools.chain.from_iterable(picks))
+        if len(chosen) > build_size:
+            continue
+        for rest in itertools.combinations(free, build_size - len(chosen)):
+            yield chosen + rest
+
+def count_valid_builds(build_size=5):
+    groups, free = _constraint_partition()
+    counts = [1]  # counts[n]: ways to pick n items from the constraint groups
+    for items, max_count in groups:
+        picks = [math.comb(len(items), k) for k in range(max_count + 1)]
+        merged = [0] * (len(counts) + len(picks) - 1)
+        for i, a in enumerate(counts):
+            for j, b in enumerate(picks):
+                merged[i + j] += a * b
+        counts = merged
+    return sum(c * math.comb(len(free), build_size - n) for n, c in enumerate(counts) if n <= build_size)
+
+# ============================================================
+# Item Stat Table
+#
+# ITEMS laid out as a struct-of-arrays: one row per item, one float64 column
+# per stat, so a build's stats are a single gather-and-sum over its rows.
+# Tuple values resolve to their mean; the Infinity Edge passive is a 0/1 column.
+# ============================================================
+STAT_ALIASES = {"Crit Chance": "Crit", "Armor Pen": "ArmorPen"}
+
+ITEM_NAMES = list(ITEMS)
+ITEM_INDEX = {name: i for i, name in enumerate(ITEM_NAMES)}
+
+STAT_COLS = ["AD", "Crit", "Lethality", "ArmorPen"]
+for _item in ITEMS.values():
+    for _stat in _item:
+        _stat = STAT_ALIASES.get(_stat, _stat)
+        if _stat != "name" and _stat not in STAT_COLS:
+            STAT_COLS.append(_stat)
+STAT_COLS.append("InfinityEdge")
+STAT_INDEX = {stat: i for i, stat in enumerate(STAT_COLS)}
+
+IDX_AD = STAT_INDEX["AD"]
+IDX_ARMORPEN = STAT_INDEX["ArmorPen"]
+IDX_INFINITY_EDGE = STAT_INDEX["InfinityEdge"]
+
+def _validate_items():
+    """
+    Checks once at import that every ITEMS value is a type the stat tables can
+    aggregate, so malformed items fail loudly here rather than mid-simulation.
+    """
+    for name, item in ITEMS.items():
+        for stat, value in item.items():
+            if stat == "name":
+                valid = isinstance(value, str)
+            elif isinstance(value, tuple):
+                valid = all(isinstance(v, (int, float)) for v in value) and len(value) > 0
+            else:
+                valid = isinstance(value, (int, float))  # bool is an int
+            if not valid:
+                raise TypeError(f"Item {name!r} has unsupported value {value!r} for stat {stat!r}")
+
+_validate_items()
+
+def build_item_table():
+    table = np.zeros((len(ITEM_NAMES), len(STAT_COLS)), dtype=np.float64)
+    for row, item in enumerate(ITEMS.values()):
+        for stat, value in item.items():
+            if stat == "name":
+                continue
+            if isinstance(value, tuple):
+                value = sum(float(v) for v in value) / len(value)
+            table[row, STAT_INDEX[STAT_ALIASES.get(stat, stat)]] += float(value)
+        if item["name"] == "Infinity Edge":
+            table[row, IDX_INFINITY_EDGE] = 1.0
+    return table
+
+ITEM_TABLE = build_item_table()
+
+# Aphelios' level 18 stat line before items
+BASE_STATS = {
+    "AD": BASE_AD_LEVEL18,
+    "AS": BASE_AS,
+    "Crit": 0.0,
+    "CritDmg": DEFAULT_CRIT_DAMAGE,
+    "Lethality": 0.0,
+    "ArmorPen": 0.0,  # % Armor Penetration (Only highest value applies)
+    "MagicPen": 0.0,
+    "OnHit": 0.0,
+    "LS": 0.0,
+    "Omnivamp": 0.0,
+    "BonusAD": 0.0,
+    "AbilityHaste": 0.0,
+    "Bonus Range": 0.0,
+    "Health": BASE_HEALTH,
+    "Armor": BASE_ARMOR,
+    "MR": BASE_MR,
+    "Mana": BASE_MANA,
+    "MoveSpeed": BASE_MOVE_SPEED,
+}
+
+def combo_indices(combo):
+    return np.array([ITEM_INDEX[item] for item in combo], dtype=np.intp)
+
+def _batch_stats(combo_idx):
+    """
+    Aggregates the ITEM_TABLE rows of a (builds, items) index array into
+    per-build stat arrays. AD is tracked as BonusAD and % Armor Pen takes the
+    highest value instead of summing.
+    """
+    rows = ITEM_TABLE[combo_idx]
+    summed = rows.sum(axis=1)
+    n_builds = combo_idx.shape[0]
+    stats = {stat: np.full(n_builds, float(value)) for stat, value in BASE_STATS.items()}
+    for stat, col in STAT_INDEX.items():
+        if stat in ("AD", "ArmorPen", "InfinityEdge"):
+            continue
+        stats[stat] = stats.get(stat, 0.0) + summed[:, col]
+
+    bonus_ad = summed[:, IDX_AD]
+    stats["BonusAD"] = bonus_ad
+    stats["AD"] = stats["AD"] + bonus_ad
+    stats["AD"] += 68  # Aphelios gains +68 AD at level 18 from his passive
+
+    stats["ArmorPen"] = rows[:, :, IDX_ARMORPEN].max(axis=1, initial=0.0)
+
+    # Cap crit chance at 100%
+    stats["Crit"] = np.minimum(stats["Crit"], 1.0)
+
+    # Apply Infinity Edge bonus if applicable
+    stats["CritDmg"] = stats["CritDmg"] + 0.4 * (summed[:, IDX_INFINITY_EDGE] > 0) # 60% requirement is no longer in the game - ueberheblichkeit
+
+    return stats
+
+def _combo_stats(combo_idx):
+    return {stat: float(values[0]) for stat, values in _batch_stats(combo_idx[np.newaxis]).items()}
+
+@functools.lru_cache(maxsize=None)
+def _base_stats_for(items_tuple):
+    """
+    Cached _combo_stats keyed on the build alone. Pass the items sorted so every
+    ordering of a build shares one entry. Returns (stat, value) pairs, since the
+    cached value must stay immutable; callers build their own dict from it.
+    """
+    return tuple(_combo_stats(combo_indices(items_tuple)).items())
+
 # ============================================================
 # Weapon Damage Factors (synergy factors)
 # ============================================================
@@ -255,6 +460,31 @@ WEAPON_DAMAGE_FACTORS = {
     "Crescendum": {"Attack Speed": 4.0, "OnHit": 3.0, "AD": 2.0, "Armor": 1.0, "MR": 1.0}
 }
 
+def build_synergy_table():
+    """
+    Returns SYNERGY_CONTRIB[item, main, off]: each item's damage synergy
+    contribution, weighting the main hand's factors 0.7 and the off hand's 0.3.
+    """
+    table = np.zeros((len(ITEM_NAMES), len(WEAPON_ORDER), len(WEAPON_ORDER)), dtype=np.float64)
+    for row, item in enumerate(ITEMS.values()):
+        for main_idx, off_idx in itertools.product(range(len(WEAPON_ORDER)), repeat=2):
+            main_factors = WEAPON_DAMAGE_FACTORS[WEAPON_ORDER[main_idx]]
+            off_factors = WEAPON_DAMAGE_FACTORS[WEAPON_ORDER[off_idx]]
+            for stat, value in item.items():
+                if stat == "name":
+                    continue
+                if isinstance(value, tuple):
+                    value = sum(float(v) for v in value) / len(value)
+                if isinstance(value, (int, float)):
+                    weapon_suitability = (
+                        main_factors.get(stat, 0.0) * 0.7 +
+                        off_factors.get(stat, 0.0) * 0.3
+                    )
+                    table[row, main_idx, off_idx] += float(value) * weapon_suitability
+    return table
+
+SYNERGY_CONTRIB = build_synergy_table()
+
 # ============================================================
 # Helper Function: Apply Physical Damage Mitigation
 #
@@ -262,23 +492,326 @@ WEAPON_DAMAGE_FACTORS = {
 #    effective_damage = raw_damage * (100 / (100 + armor))   if armor >= 0
 #    effective_damage = raw_damage * (2 - 100 / (100 - armor)) if armor < 0
 # ============================================================
-def apply_physical_mitigation(damage, enemy_armor, armor_pen=0.0, lethality=0.0):
+@numba.njit(cache=True)
+def _compute_mitigation(enemy_armor, armor_pen=0.0, lethality=0.0):
     """
-    Applies armor penetration in correct order:
+    Returns the damage multiplier left after armor, applying penetration in correct order:
     1. Percentage Penetration
     2. Lethality
-    Returns final damage after mitigation
+    Its inputs are constant over a fight, so callers compute it once and reuse it.
     """
    
     # Apply penetration in correct order
     final_armor = max(0,((enemy_armor*(1-armor_pen))-lethality)) # percentage pen comes first, then lethality. also since sometime in s14 lethality no longer scales and is just the full value starting lvl1 - ueberheblichkeit
     
     if final_armor >= 0:
-        multiplier = 100 / (100 + final_armor)
-    else:
-        multiplier = 2 - 100 / (100 - final_armor)
-    
-    return damage * multiplier
+        return 100 / (100 + final_armor)
+    return 2 - 100 / (100 - final_armor)
+
+@numba.njit(cache=True)
+def apply_physical_mitigation(damage, enemy_armor, armor_pen=0.0, lethality=0.0):
+    """
+    Applies armor penetration in correct order:
+    1. Percentage Penetration
+    2. Lethality
+    Returns final damage after mitigation
+    """
+    return damage * _compute_mitigation(enemy_armor, armor_pen, lethality)
+
+# ============================================================
+# Jitted DPS Core
+#
+# Numerical twin of ApheliosSimulator.calculate_dps/simulate_attack/
+# simulate_ability/rotate_weapon. Weapons are identified by their index in
+# WEAPON_ORDER; since the queue only ever rotates, the main hand is always the
+# queue head and the off hand the slot after it.
+# ============================================================
+def _attack_speed(as_stat):
+    return np.minimum(3, BASE_AS * (1 + as_stat))
+
+def _max_random_draws(duration, attack_speed=3.0):
+    # Each attack rolls crit plus at most one Crescendum roll
+    return 2 * (int(max(duration, 0) * float(attack_speed)) + 32)
+
+@numba.njit(cache=True)
+def _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons):
+    time += 1.0  # 1 second assembly time
+    ability_cooldown = max(ability_cooldown, time + 1.5)
+
+    # Crescendum stack preservation
+    if head == CRESCENDUM:
+        chakram_stacks = int(chakram_stacks * 0.7)
+
+    return (head + 1) % n_weapons, time, ability_cooldown, chakram_stacks
+
+# Explicit signatures for the kernels called from Python, so they are compiled (or
+# loaded from the on-disk cache) at import instead of on the first call.
+_F8 = numba.float64
+_F8_1D = numba.float64[:]
+_F8_2D = numba.float64[:, :]
+_I8_1D = numba.int64[:]
+
+@numba.njit(_F8(_F8, _F8, _F8, _F8, _F8, _F8, _F8, _F8, _F8, _F8_2D, _I8_1D, _F8_1D, _F8_1D, _F8_1D),
+            cache=True, fastmath=True)
+def _simulate_dps_core(duration, base_ad, bonus_ad, crit, crit_dmg, as_stat, armor_pen, lethality,
+                       enemy_armor, weapon_mods_arr, weapon_ammo_arr, moonlight_arr, ability_mult_arr, rng_buf):
+    n_weapons = weapon_mods_arr.shape[0]
+    ammo = weapon_ammo_arr.copy()
+    total_ad = base_ad + bonus_ad + 68  # Level 18 passive AD
+    attack_time = 1.0 / min(3, BASE_AS * (1 + as_stat))
+
+    time = 0.0
+    ability_cooldown = 0.0
+    head = 0
+    chakram_stacks = 0
+    total_damage = 0.0  # before mitigation, which is constant over the fight
+    rng_cur = 0
+
+    # Random rolls are read from rng_buf, sized by _max_random_draws(duration).
+    # Chakram expiries are appended in time order, so the active ones are always
+    # the tail of this buffer starting at chakram_head.
+    chakram_expiry = np.empty(max(0, int(duration / ABILITY_COOLDOWN)) + 2)
+    n_chakrams = 0
+    chakram_head = 0
+
+    while time < duration:
+        if ammo[head] <= 0:
+            head, time, ability_cooldown, chakram_stacks = _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons)
+
+        # --- attack ---
+        if ammo[head] <= 0:
+            head, time, ability_cooldown, chakram_stacks = _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons)
+        ammo[head] -= 1
+        if ammo[head] <= 0:
+            head, time, ability_cooldown, chakram_stacks = _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons)
+
+        main = head
+        off = (head + 1) % n_weapons
+        roll = rng_buf[rng_cur]
+        rng_cur += 1
+        if roll < crit:
+            damage = total_ad * crit_dmg
+        else:
+            damage = total_ad
+        damage *= weapon_mods_arr[main, 0]
+
+        if main == CALIBRUM:
+            damage += total_ad * 0.15  # 15% AD mark damage
+        elif main == INFERNUM:
+            damage += total_ad * 0.75  # 75% AD splash
+
+        if main == CRESCENDUM:
+            chakram_stacks = max(0, chakram_stacks - 3)
+        elif off == CRESCENDUM:
+            roll = rng_buf[rng_cur]
+            rng_cur += 1
+            if roll < 0.65:
+                chakram_stacks = min(20, chakram_stacks + 1)
+
+        total_damage += damage
+        time += attack_time
+
+        # --- ability ---
+        if time - ability_cooldown >= ABILITY_COOLDOWN and moonlight_arr[head] >= 10:
+            if ammo[head] <= 0:
+                head, time, ability_cooldown, chakram_stacks = _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons)
+            ammo[head] -= 10
+            if ammo[head] <= 0:
+                head, time, ability_cooldown, chakram_stacks = _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons)
+
+            main = head
+            raw_ability_damage = total_ad * weapon_mods_arr[main, 1] * ability_mult_arr[main]
+            if main == CRESCENDUM:
+                chakram_expiry[n_chakrams] = time + 5.0
+                n_chakrams += 1
+            while chakram_head < n_chakrams and chakram_expiry[chakram_head] <= time:
+                chakram_head += 1
+            chakram_stacks = n_chakrams - chakram_head
+
+            total_damage += raw_ability_damage
+            ability_cooldown = time + ABILITY_CAST_TIME
+            time += ABILITY_CAST_TIME
+
+    total_damage *= _compute_mitigation(enemy_armor, armor_pen, lethality)
+    return total_damage / duration if duration > 0 else 0.0
+
+def _dps_for_stats(stats, duration, enemy_armor, weapon_ammo_arr, rng_buf):
+    return _simulate_dps_core(
+        float(duration),
+        BASE_AD_LEVEL18,
+        stats["BonusAD"],
+        stats["Crit"],
+        stats["CritDmg"],
+        stats.get("AS", 0.0),
+        stats.get("ArmorPen", 0.0),
+        stats.get("Lethality", 0.0),
+        float(enemy_armor),
+        WEAPON_MODS,
+        weapon_ammo_arr,
+        WEAPON_MOONLIGHT,
+        WEAPON_ABILITY_MULT,
+        rng_buf
+    )
+
+@numba.njit(_F8_1D(_F8, _F8, _F8_1D, _F8_1D, _F8_1D, _F8_1D, _F8_1D, _F8_1D, _F8, _F8_2D, _I8_1D, _F8_1D, _F8_1D, _F8_2D),
+            cache=True)
+def _simulate_dps_batch(duration, base_ad, bonus_ad, crit, crit_dmg, as_stat, armor_pen, lethality,
+                        enemy_armor, weapon_mods_arr, weapon_ammo_arr, moonlight_arr, ability_mult_arr, rng_buf):
+    dps = np.empty(bonus_ad.shape[0])
+    for b in range(bonus_ad.shape[0]):
+        dps[b] = _simulate_dps_core(duration, base_ad, bonus_ad[b], crit[b], crit_dmg[b], as_stat[b],
+                                    armor_pen[b], lethality[b], enemy_armor, weapon_mods_arr,
+                                    weapon_ammo_arr, moonlight_arr, ability_mult_arr, rng_buf[b])
+    return dps
+
+def _dps_for_batch(stats, duration, enemy_armor, weapon_ammo_arr, rng_buf):
+    return _simulate_dps_batch(
+        float(duration),
+        BASE_AD_LEVEL18,
+        stats["BonusAD"],
+        stats["Crit"],
+        stats["CritDmg"],
+        stats["AS"],
+        stats["ArmorPen"],
+        stats["Lethality"],
+        float(enemy_armor),
+        WEAPON_MODS,
+        weapon_ammo_arr,
+        WEAPON_MOONLIGHT,
+        WEAPON_ABILITY_MULT,
+        rng_buf
+    )
+
+# ============================================================
+# Expected-Value DPS
+#
+# Crits and chakram stacks never change the fight's timing, so the number of
+# attacks and abilities each weapon gets is fixed by attack speed alone, and
+# expected damage is linear in the crit factor. Expected DPS is therefore exact
+# from one pass over the deterministic rotation, shared by every build with the
+# same attack speed.
+# ============================================================
+@numba.njit(cache=True)
+def _rotation_schedule(duration, attack_time, weapon_ammo_arr, moonlight_arr):
+    """Runs _simulate_dps_core's timeline without damage; returns per-weapon attack and ability counts."""
+    n_weapons = weapon_ammo_arr.shape[0]
+    ammo = weapon_ammo_arr.copy()
+    attacks = np.zeros(n_weapons)
+    abilities = np.zeros(n_weapons)
+
+    time = 0.0
+    ability_cooldown = 0.0
+    head = 0
+    chakram_stacks = 0
+
+    while time < duration:
+        if ammo[head] <= 0:
+            head, time, ability_cooldown, chakram_stacks = _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons)
+
+        if ammo[head] <= 0:
+            head, time, ability_cooldown, chakram_stacks = _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons)
+        ammo[head] -= 1
+        if ammo[head] <= 0:
+            head, time, ability_cooldown, chakram_stacks = _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons)
+        attacks[head] += 1
+        time += attack_time
+
+        if time - ability_cooldown >= ABILITY_COOLDOWN and moonlight_arr[head] >= 10:
+            if ammo[head] <= 0:
+                head, time, ability_cooldown, chakram_stacks = _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons)
+            ammo[head] -= 10
+            if ammo[head] <= 0:
+                head, time, ability_cooldown, chakram_stacks = _rotate_core(head, time, ability_cooldown, chakram_stacks, n_weapons)
+            abilities[head] += 1
+            ability_cooldown = time + ABILITY_CAST_TIME
+            time += ABILITY_CAST_TIME
+
+    return attacks, abilities
+
+@numba.njit(_F8_1D(_F8, _F8, _F8_1D, _F8_1D, _F8_1D, _F8_1D, _F8_1D, _F8_1D, _F8, _F8_2D, _I8_1D, _F8_1D, _F8_1D, _F8_1D),
+            cache=True)
+def _expected_dps_batch(duration, base_ad, bonus_ad, crit, crit_dmg, as_stat, armor_pen, lethality,
+                        enemy_armor, weapon_mods_arr, weapon_ammo_arr, moonlight_arr, ability_mult_arr, ad_bonus_arr):
+    dps = np.zeros(bonus_ad.shape[0])
+    if duration <= 0:
+        return dps
+
+    schedule_as = np.nan
+    attack_mod = ad_bonus = ability_mod = 0.0
+    for b in range(bonus_ad.shape[0]):
+        if as_stat[b] != schedule_as:
+            schedule_as = as_stat[b]
+            attacks, abilities = _rotation_schedule(duration, 1.0 / min(3, BASE_AS * (1 + schedule_as)),
+                                                    weapon_ammo_arr, moonlight_arr)
+            attack_mod = (attacks * weapon_mods_arr[:, 0]).sum()
+            ad_bonus = (attacks * ad_bonus_arr).sum()
+            ability_mod = (abilities * weapon_mods_arr[:, 1] * ability_mult_arr).sum()
+
+        total_ad = base_ad + bonus_ad[b] + 68  # Level 18 passive AD
+        crit_factor = 1 + crit[b] * (crit_dmg[b] - 1)
+        total_damage = total_ad * (crit_factor * attack_mod + ad_bonus + ability_mod)
+        dps[b] = total_damage * _compute_mitigation(enemy_armor, armor_pen[b], lethality[b]) / duration
+    return dps
+
+def _expected_dps_for_batch(stats, duration, enemy_armor, weapon_ammo_arr):
+    return _expected_dps_batch(
+        float(duration),
+        BASE_AD_LEVEL18,
+        stats["BonusAD"],
+        stats["Crit"],
+        stats["CritDmg"],
+        stats["AS"],
+        stats["ArmorPen"],
+        stats["Lethality"],
+        float(enemy_armor),
+        WEAPON_MODS,
+        weapon_ammo_arr,
+        WEAPON_MOONLIGHT,
+        WEAPON_ABILITY_MULT,
+        WEAPON_AD_BONUS
+    )
+
+def _expected_dps_for_stats(stats, duration, enemy_armor, weapon_ammo_arr):
+    batch = {
+        stat: np.array([float(stats.get(stat, 0.0))])
+        for stat in ("BonusAD", "Crit", "CritDmg", "AS", "ArmorPen", "Lethality")
+    }
+    return float(_expected_dps_for_batch(batch, duration, enemy_armor, weapon_ammo_arr)[0])
+
+# ============================================================
+# Weapon Effect Dispatch
+#
+# Per-weapon on-attack and on-ability effects for ApheliosSimulator, indexed by
+# weapon id. Each takes the simulator, the damage so far and total AD, and
+# returns the damage after the effect.
+# ============================================================
+def _no_bonus(sim, damage, total_ad):
+    return damage
+
+def _atk_bonus_calibrum(sim, damage, total_ad):
+    return damage + total_ad * 0.15  # 15% AD mark damage
+
+def _atk_bonus_severum(sim, damage, total_ad):
+    sim.stats["LS"] += damage * 0.03
+    return damage
+
+def _atk_bonus_infernum(sim, damage, total_ad):
+    return damage + total_ad * 0.75  # 75% AD splash
+
+def _atk_bonus_crescendum(sim, damage, total_ad):
+    sim.chakram_stacks = max(0, sim.chakram_stacks - 3)
+    return damage
+
+def _ability_bonus_severum(sim, damage, total_ad):
+    sim.stats["LS"] += damage * 0.03
+    return damage
+
+def _ability_bonus_crescendum(sim, damage, total_ad):
+    sim._chakram_expiry.append(sim.time + 5.0)
+    return damage
+
+_ATK_TABLE = (_atk_bonus_calibrum, _atk_bonus_severum, _no_bonus, _atk_bonus_infernum, _atk_bonus_crescendum)
+_ABILITY_TABLE = (_no_bonus, _ability_bonus_severum, _no_bonus, _no_bonus, _ability_bonus_crescendum)
 
 # ============================================================
 # Aphelios Simulator
@@ -286,117 +819,61 @@ def apply_physical_mitigation(damage, enemy_armor, armor_pen=0.0, lethality=0.0)
 class ApheliosSimulator:
     """Simulates Aphelios' damage output and build performance."""
     def __init__(self, items, enemy_armor=250.0, enemy_health=3500.0, weapon_switch_delay=ROTATION_DELAY, simulate_random=True):
-        self.weapon_queue = deque(["Calibrum", "Severum", "Gravitum", "Infernum", "Crescendum"])
-        self.main_hand = WEAPONS[self.weapon_queue[0]]
-        self.off_hand = WEAPONS[self.weapon_queue[1]]
+        self._queue = np.arange(len(WEAPON_ORDER), dtype=np.int8)
+        self._queue_head = 0
+        self.mh_idx = int(self._queue[0])
+        self.oh_idx = int(self._queue[1])
         self.item_names = items
         self.item_stats = [ITEMS[item] for item in items if item in ITEMS]
         self.stats = self._calculate_base_stats(tuple(items))
         self.enemy_armor = float(enemy_armor)
         self.enemy_health = float(enemy_health)
+        self.simulate_random = simulate_random
+        self.mitigation_mult = _compute_mitigation(
+            self.enemy_armor,
+            self.stats.get("ArmorPen", 0.0),
+            self.stats.get("Lethality", 0.0)
+        )
         self.time = 0.0  # Simulation time in seconds
         self.ability_cooldown = 0.0
-        self.weapon_ammo = {w: 50 for w in WEAPONS}
+        self.weapon_ammo = array.array('i', STARTING_AMMO.tolist())  # indexed by weapon id
+        self._rng = np.random.default_rng()
+        self._rng_buf = self._rng.random(RNG_BUFFER_SIZE)
+        self._rng_cur = 0
         self.chakram_stacks = 0
-        self.active_chakrams = set()
+        self._chakram_expiry = deque()  # expiry times, in the order chakrams were created
         self.crescendum_return_times = {}
         self.active_marks = {}
 
-    @functools.lru_cache(maxsize=128)
     def _calculate_base_stats(self, items_tuple):
-        items = list(items_tuple)
-        stats = {
-            "AD": BASE_AD_LEVEL18,
-            "AS": BASE_AS,
-            "Crit": 0.0,
-            "CritDmg": DEFAULT_CRIT_DAMAGE,
-            "Lethality": 0.0,
-            "ArmorPen": 0.0,  # % Armor Penetration (Only highest value applies)
-            "MagicPen": 0.0,
-            "OnHit": 0.0,
-            "LS": 0.0,
-            "Omnivamp": 0.0,
-            "BonusAD": 0.0,
-            "AbilityHaste": 0.0,
-            "Bonus Range": 0.0,
-            "Health": BASE_HEALTH,
-            "Armor": BASE_ARMOR,
-            "MR": BASE_MR,
-            "Mana": BASE_MANA,
-            "MoveSpeed": BASE_MOVE_SPEED,
-        }
-
-        has_infinity_edge = False
-        bonus_ad = 0.0
-
-        for item in self.item_stats:
-            for stat, value in item.items():
-                if stat == "name":
-                    if value == "Infinity Edge":
-                        has_infinity_edge = True
-                    continue
-                if stat == "Crit Chance":
-                    stats["Crit"] += float(value)
-                    continue
-                if stat == "AD":
-                    bonus_ad += float(value)
-                    continue
-                if stat in ["ArmorPen", "Armor Pen"]:  # Pick highest % Armor Pen
-                    stats["ArmorPen"] = max(stats["ArmorPen"], float(value))
-                if stat == "Lethality":  # Lethality stacks
-                    stats["Lethality"] += float(value)
-                    continue
-                if isinstance(value, tuple):
-                    try:
-                        stats[stat] = stats.get(stat, 0.0) + sum(float(v) for v in value) / len(value)
-                    except (ValueError, TypeError):
-                        continue
-                elif isinstance(value, (int, float)):
-                    stats[stat] = stats.get(stat, 0.0) + float(value)
-                elif isinstance(value, bool):
-                    continue
-                else:
-                    print(f"Warning: Unexpected type for item {item.get('name', 'N/A')}, stat {stat}. Skipping.")
-
-        stats["BonusAD"] = bonus_ad
-        stats["AD"] += bonus_ad
-        stats["AD"] += 68  # Aphelios gains +68 AD at level 18 from his passive
-
-        # Cap crit chance at 100%
-        stats["Crit"] = min(stats["Crit"], 1.0)
+        return dict(_base_stats_for(tuple(sorted(item for item in items_tuple if item in ITEMS))))
 
-        # Apply Infinity Edge bonus if applicable
-        if has_infinity_edge: # 60% requirement is no longer in the game - ueberheblichkeit
-            stats["CritDmg"] += 0.4 
-
-        return stats
+    def _next_random(self):
+        if self._rng_cur >= len(self._rng_buf):
+            self._rng_buf = self._rng.random(len(self._rng_buf))
+            self._rng_cur = 0
+        roll = self._rng_buf[self._rng_cur]
+        self._rng_cur += 1
+        return roll
 
     def calculate_dps(self, duration=500):
-        total_damage = 0.0
-        
-        while self.time < duration:
-            if self.weapon_ammo[self.main_hand.name] <= 0:
-                self.rotate_weapon()
-            
-            # Calculate attack speed with proper bounds
-            attack_speed = min(3, BASE_AS * (1 + self.stats.get("AS", 0)))
-            attack_time = 1.0 / attack_speed
-            
-            total_damage += self.simulate_attack()
-            self.time += attack_time
-            
-            if self.time - self.ability_cooldown >= ABILITY_COOLDOWN and self.main_hand.moonlight >= 10:
-                total_damage += self.simulate_ability()
-                self.ability_cooldown = self.time + ABILITY_CAST_TIME
-                self.time += ABILITY_CAST_TIME
-        
-        if all(ammo <= 0 for ammo in self.weapon_ammo.values()):
-            self.rotate_weapon()
-        
-        return total_damage / duration if duration > 0 else 0
+        """
+        Simulates a fresh fight from the starting rotation and full ammo.
+        The step state (weapons, ammo, stacks, cooldowns) is neither read nor advanced.
+        """
+        if not self.simulate_random:
+            return _expected_dps_for_stats(self.stats, duration, self.enemy_armor, STARTING_AMMO)
+
+        n_draws = _max_random_draws(duration, _attack_speed(self.stats.get("AS", 0.0)))
+        if len(self._rng_buf) - self._rng_cur < n_draws:
+            self._rng_buf = self._rng.random(max(n_draws, len(self._rng_buf)))
+            self._rng_cur = 0
+        rng_buf = self._rng_buf[self._rng_cur:self._rng_cur + n_draws]
+        self._rng_cur += n_draws
+        return _dps_for_stats(self.stats, duration, self.enemy_armor, STARTING_AMMO, rng_buf)
 
     def simulate_attack(self):
-        if self.weapon_ammo[self.main_hand.name] <= 0:
+        if self.weapon_ammo[self.mh_idx] <= 0:
             self.rotate_weapon()
         
         self.use_ammo(1)
@@ -408,80 +885,44 @@ class ApheliosSimulator:
         attack_speed = min(2.5, BASE_AS * (1 + self.stats.get("AS", 0)))
         base_damage = total_ad
         
-        if random.random() < self.stats["Crit"]:
+        if self._next_random() < self.stats["Crit"]:
             crit_multiplier = self.stats["CritDmg"]
             damage = base_damage * crit_multiplier
         else:
             damage = base_damage
 
-        weapon_modifier = self.main_hand.base_damage_mod[0]
+        mh = self.mh_idx
+        weapon_modifier = WEAPON_MOD0[mh]
         damage *= weapon_modifier
+        damage = _ATK_TABLE[mh](self, damage, total_ad)
         
-        if self.main_hand.name == "Calibrum":
-            mark_damage = total_ad * 0.15  # 15% AD mark damage
-            damage += mark_damage
-        elif self.main_hand.name == "Severum":
-            self.stats["LS"] += damage * 0.03
-        elif self.main_hand.name == "Infernum":
-            splash_damage = total_ad * 0.75  # 75% AD splash
-            damage += splash_damage
-        
-        if self.main_hand.name == "Crescendum":
-            base_damage = total_ad * (0.1385 * self.chakram_stacks)  # Bonus damage only
-            self.chakram_stacks = max(0, self.chakram_stacks - 3)
-        elif self.off_hand.name == "Crescendum":
-            if random.random() < 0.65:
+        if self.oh_idx == CRESCENDUM:  # main and off hand are never the same weapon
+            if self._next_random() < 0.65:
                 self.chakram_stacks = min(20, self.chakram_stacks + 1)
     
-        effective_damage = apply_physical_mitigation(
-            damage,
-            self.enemy_armor,
-            self.stats.get("ArmorPen", 0.0),
-            self.stats.get("Lethality", 0.0)
-        )
-
-        return effective_damage
+        return damage * self.mitigation_mult
     
     def simulate_ability(self):
-        if self.weapon_ammo[self.main_hand.name] <= 0:
+        if self.weapon_ammo[self.mh_idx] <= 0:
             self.rotate_weapon()
         
         self.use_ammo(10)
         
         total_ad = BASE_AD_LEVEL18 + self.stats["BonusAD"] + 68  # Level 18 passive AD
-        weapon = self.main_hand.name
+        weapon = self.mh_idx
         
-        raw_ability_damage = total_ad * WEAPONS[weapon].base_damage_mod[1]
+        raw_ability_damage = total_ad * WEAPON_MOD1[weapon] * WEAPON_ABILITY_MULT[weapon]
+        raw_ability_damage = _ABILITY_TABLE[weapon](self, raw_ability_damage, total_ad)
         
-        ability_effects = WEAPONS[weapon].ability_effect
-        if weapon == "Calibrum":
-            if "execute" in ability_effects:
-                raw_ability_damage *= (1 + ability_effects["execute"])
-        elif weapon == "Severum":
-            if "lifesteal_boost" in ability_effects:
-                raw_ability_damage *= (1 + ability_effects["lifesteal_boost"])
-                self.stats["LS"] += raw_ability_damage * 0.03
-        elif weapon == "Infernum":
-            if "splash" in ability_effects:
-                raw_ability_damage *= (1 + ability_effects["splash"])
-                raw_ability_damage *= 1.25  # AOE bonus
-        if self.main_hand.name == "Crescendum":
-            self.active_chakrams.add(self.time + 5.0)
+        while self._chakram_expiry and self._chakram_expiry[0] <= self.time:
+            self._chakram_expiry.popleft()
+        self.chakram_stacks = len(self._chakram_expiry)
         
-        self.chakram_stacks = len([t for t in self.active_chakrams if t > self.time])
-        
-        effective_damage = apply_physical_mitigation(
-            raw_ability_damage,
-            self.enemy_armor,
-            self.stats.get("ArmorPen", 0.0),
-            self.stats.get("Lethality", 0.0)
-        )
-        
-        return effective_damage
+        return raw_ability_damage * self.mitigation_mult
 
     def use_ammo(self, amount=1):
-        self.weapon_ammo[self.main_hand.name] -= amount
-        if self.weapon_ammo[self.main_hand.name] <= 0:
+        self.weapon_ammo[self.mh_idx] -= amount
+        if self.weapon_ammo[self.mh_idx] <= 0:
             self.rotate_weapon()
     def rotate_weapon(self):
         # Proper rotation delay from PDF
@@ -489,96 +930,171 @@ class ApheliosSimulator:
         self.ability_cooldown = max(self.ability_cooldown, self.time + 1.5)
 
         # Move exhausted weapon to end of queue
-        exhausted = self.weapon_queue.popleft()
-        self.weapon_queue.append(exhausted)
+        exhausted = self.mh_idx
+        self._queue_head = (self._queue_head + 1) % len(self._queue)
         
         # Update current weapons
-        self.main_hand = WEAPONS[self.weapon_queue[0]]
-        self.off_hand = WEAPONS[self.weapon_queue[1]]
+        self.mh_idx = int(self._queue[self._queue_head])
+        self.oh_idx = int(self._queue[(self._queue_head + 1) % len(self._queue)])
 
         # Crescendum stack preservation
-        if exhausted == "Crescendum":
+        if exhausted == CRESCENDUM:
             self.chakram_stacks = int(self.chakram_stacks * 0.7)
 
-# ============================================================
-# Chunking Helper Function
-# ============================================================
-def chunkify(lst, chunk_size):
-    for i in range(0, len(lst), chunk_size):
-        yield lst[i:i+chunk_size]
-
 # ============================================================
 # Build Simulation Functions
 # ============================================================
-def simulate_build(combo, simulation_duration, enemy_armor, enemy_health):
-    try:
-        simulator = ApheliosSimulator(combo, enemy_armor=enemy_armor, enemy_health=enemy_health)
-        main_weapon = simulator.main_hand.name
-        off_weapon = simulator.off_hand.name
-
-        damage_synergy = 0.0
-        for item in combo:
-            item_stats = ITEMS[item]
-            for stat, value in item_stats.items():
-                if stat == "name":
-                    continue
-                if isinstance(value, tuple):
-                    value = sum(float(v) for v in value) / len(value)
-                if isinstance(value, (int, float)):
-                    weapon_suitability = (
-                        WEAPON_DAMAGE_FACTORS[main_weapon].get(stat, 0.0) * 0.7 +
-                        WEAPON_DAMAGE_FACTORS[off_weapon].get(stat, 0.0) * 0.3
-                    )
-                    damage_synergy += float(value) * weapon_suitability
-
-        synergy_key = (main_weapon, off_weapon)
-        if synergy_key not in WEAPON_SYNERGIES:
-            synergy_key = (off_weapon, main_weapon)
-        if synergy_key in WEAPON_SYNERGIES:
-            multiplier = WEAPON_SYNERGIES[synergy_key].get("multiplier", 1.0)
-            damage_synergy *= multiplier
-
-        dps = simulator.calculate_dps(simulation_duration)
-        health_scaling = 0.0
-        armor_mr_rating = 0.0
-        mobility_factor = simulator.stats["MoveSpeed"] * 0.01
-        life_steal_rating = 0.0
-        omnivamp_rating = 0.0
-
-        total_score = dps * 10 + damage_synergy * 5
-
-        return (combo, total_score, dps, damage_synergy, health_scaling, armor_mr_rating, mobility_factor, life_steal_rating, omnivamp_rating)
-    except Exception as e:
-        print(f"Error during simulation for {combo}: {e}")
-        return (combo, 0, 0, 0, 0, 0, 0, 0, 0)
-
-def simulate_build_chunk(builds, simulation_duration, enemy_armor, enemy_health):
-    results = []
-    for combo in builds:
-        result = simulate_build(combo, simulation_duration, enemy_armor, enemy_health)
-        results.append(result)
+def _damage_synergy(combo_idx, main_idx, off_idx):
+    """Damage synergy of one build, or of each row of a (builds, items) index array."""
+    damage_synergy = SYNERGY_CONTRIB[combo_idx, main_idx, off_idx].sum(axis=-1)
+    return damage_synergy * SYNERGY_MULT[main_idx, off_idx]
+
+# Numeric fields of a build result, in order; the build itself is kept apart
+RESULT_FIELDS = ("total_score", "dps", "damage_synergy", "health_scaling", "armor_mr_rating",
+                 "mobility_factor", "life_steal_rating", "omnivamp_rating")
+
+# Per-build inputs to the DPS kernels and the score, one row per build
+BUILD_FIELDS = ("BonusAD", "Crit", "CritDmg", "AS", "ArmorPen", "Lethality", "MoveSpeed", "damage_synergy")
+
+def build_stat_rows(combo_idx):
+    """Derives the BUILD_FIELDS row of every build in a (builds, items) index array."""
+    stats = _batch_stats(combo_idx)
+    stats["damage_synergy"] = _damage_synergy(combo_idx, CALIBRUM, SEVERUM)
+    return np.column_stack([stats[field] for field in BUILD_FIELDS])
+
+def _simulate_stat_rows(build_rows, simulation_duration, enemy_armor, simulate_random=True):
+    """
+    Simulates every row of a (builds, len(BUILD_FIELDS)) array in one batched
+    pass of the jitted core. With simulate_random=False, DPS is the exact
+    expected value instead of one stochastic fight. Returns a
+    (builds, len(RESULT_FIELDS)) float64 array.
+    """
+    stats = {field: build_rows[:, col] for col, field in enumerate(BUILD_FIELDS)}
+    if simulate_random:
+        n_draws = _max_random_draws(simulation_duration, _attack_speed(stats["AS"]).max(initial=0.0))
+        rng_buf = np.random.default_rng().random((len(build_rows), n_draws))
+        dps = _dps_for_batch(stats, simulation_duration, enemy_armor, STARTING_AMMO, rng_buf)
+    else:
+        dps = _expected_dps_for_batch(stats, simulation_duration, enemy_armor, STARTING_AMMO)
+    damage_synergy = stats["damage_synergy"]
+
+    rows = np.zeros((len(build_rows), len(RESULT_FIELDS)), dtype=np.float64)
+    rows[:, 0] = dps * 10 + damage_synergy * 5
+    rows[:, 1] = dps
+    rows[:, 2] = damage_synergy
+    rows[:, 5] = stats["MoveSpeed"] * 0.01  # mobility factor
+    return rows
+
+def _simulate_combo_rows(combo_idx, simulation_duration, enemy_armor, simulate_random=True):
+    return _simulate_stat_rows(build_stat_rows(combo_idx), simulation_duration, enemy_armor, simulate_random)
+
+def _build_result(combo, row):
+    return (combo, *(float(value) for value in row))
+
+def simulate_build(combo, simulation_duration, enemy_armor, enemy_health, simulate_random=True):
+    row = _simulate_combo_rows(combo_indices(combo)[np.newaxis], simulation_duration, enemy_armor, simulate_random)[0]
+    return _build_result(combo, row)
+
+def simulate_build_chunk(builds, simulation_duration, enemy_armor, enemy_health, simulate_random=True):
+    if not builds:
+        return []
+
+    # Builds of different sizes are batched separately, one index array per size
+    positions_by_size = {}
+    for pos, combo in enumerate(builds):
+        positions_by_size.setdefault(len(combo), []).append(pos)
+
+    results = [None] * len(builds)
+    for build_size, positions in positions_by_size.items():
+        combo_idx = np.array([combo_indices(builds[pos]) for pos in positions], dtype=np.intp).reshape(len(positions), build_size)
+        rows = _simulate_combo_rows(combo_idx, simulation_duration, enemy_armor, simulate_random)
+        for pos, row in zip(positions, rows):
+            results[pos] = _build_result(builds[pos], row)
     return results
 
-def optimize_aphelios_build(simulation_duration=900, enemy_armor=200, enemy_health=3000, chunk_size=500):
+# Per-worker state set up once by _init_worker
+_worker_shm = []
+_worker_build_rows = None
+_worker_results = None
+
+def _init_worker(build_shm_name, result_shm_name, n_builds):
+    """
+    Runs once per worker process: attaches the shared build stat and result
+    arrays and loads the jitted kernels, so every task starts hot.
+    """
+    global _worker_build_rows, _worker_results
+    build_shm = shared_memory.SharedMemory(name=build_shm_name)
+    result_shm = shared_memory.SharedMemory(name=result_shm_name)
+    _worker_shm[:] = [build_shm, result_shm]  # keep the blocks mapped for the worker's lifetime
+    _worker_build_rows = np.ndarray((n_builds, len(BUILD_FIELDS)), dtype=np.float64, buffer=build_shm.buf)
+    _worker_results = np.ndarray((n_builds, len(RESULT_FIELDS)), dtype=np.float64, buffer=result_shm.buf)
+    for simulate_random in (True, False):
+        _simulate_stat_rows(np.zeros((1, len(BUILD_FIELDS))), 1.0, 0.0, simulate_random)
+
+def simulate_build_range(start, end, simulation_duration, enemy_armor, enemy_health, simulate_random=True):
+    """
+    Worker task: simulates builds [start, end) of the shared build stat array
+    and writes their result rows in place into the shared result array.
+    """
+    _worker_results[start:end] = _simulate_stat_rows(_worker_build_rows[start:end], simulation_duration, enemy_armor, simulate_random)
+
+def valid_combo_indices(build_size=5):
+    """Returns every valid build as a (builds, build_size) array of ITEM_TABLE rows."""
+    n_builds = count_valid_builds(build_size)
+    flat = np.fromiter(
+        (ITEM_INDEX[item] for combo in valid_item_combinations(build_size) for item in combo),
+        dtype=np.intp,
+        count=n_builds * build_size
+    )
+    return flat.reshape(n_builds, build_size)
+
+def optimize_aphelios_build(simulation_duration=900, enemy_armor=200, enemy_health=3000, chunk_size=500, simulate_random=True, top_k=20):
+    """
+    Simulates every valid build and returns the top_k results ranked by total
+    score, then DPS. Pass top_k=None for the full ranking.
+    """
     # Generate only valid item combinations
-    item_combos = [
-        combo for combo in itertools.combinations(ITEMS.keys(), 5)
-        if is_valid_build(combo)
-    ]
-    
-    chunks = list(chunkify(item_combos, chunk_size))
-    all_results = []
-    print(f"Testing {len(item_combos)} valid builds in {len(chunks)} chunks.")
-
-    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
-        futures = [
-            executor.submit(simulate_build_chunk, chunk, simulation_duration, enemy_armor, enemy_health)
-            for chunk in chunks
-        ]
-        for future in concurrent.futures.as_completed(futures):
-            all_results.extend(future.result())
-
-    return sorted(all_results, key=lambda x: (-x[1], -x[2]))
+    combo_idx = valid_combo_indices()
+    n_builds = len(combo_idx)
+    print(f"Testing {n_builds} valid builds in {math.ceil(n_builds / chunk_size)} chunks.")
+
+    # Build stats are derived once here; workers read them from and write
+    # results to shared memory, so only chunk bounds cross the process boundary.
+    build_shm = shared_memory.SharedMemory(create=True, size=max(n_builds * len(BUILD_FIELDS) * 8, 1))
+    result_shm = shared_memory.SharedMemory(create=True, size=max(n_builds * len(RESULT_FIELDS) * 8, 1))
+    try:
+        build_rows = np.ndarray((n_builds, len(BUILD_FIELDS)), dtype=np.float64, buffer=build_shm.buf)
+        for start in range(0, n_builds, chunk_size):
+            build_rows[start:start + chunk_size] = build_stat_rows(combo_idx[start:start + chunk_size])
+        del build_rows  # release the buffer view before closing
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(build_shm.name, result_shm.name, n_builds)
+        ) as executor:
+            futures = [
+                executor.submit(simulate_build_range, start, min(start + chunk_size, n_builds),
+                                simulation_duration, enemy_armor, enemy_health, simulate_random)
+                for start in range(0, n_builds, chunk_size)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+
+        results = np.ndarray((n_builds, len(RESULT_FIELDS)), dtype=np.float64, buffer=result_shm.buf).copy()
+    finally:
+        build_shm.close()
+        build_shm.unlink()
+        result_shm.close()
+        result_shm.unlink()
+
+    # Rank on (score, dps) rows and only build result tuples for the builds returned
+    rank_keys = results[:, :2].tolist()
+    if top_k is None:
+        ranked = sorted(range(n_builds), key=rank_keys.__getitem__, reverse=True)
+    else:
+        ranked = heapq.nlargest(top_k, range(n_builds), key=rank_keys.__getitem__)
+    return [_build_result(tuple(ITEM_NAMES[i] for i in combo_idx[b]), results[b]) for b in ranked]
 
 if __name__ == "__main__":
     top_builds = optimize_aphelios_build()